@@ -8,14 +8,15 @@ angles are in degrees, except in the functions dealing with projection.
 indexing is z[i,j] = z(ф[i], λ[j])
 """
 import os
-from math import cos, hypot, ceil, sin, nan, tan, inf, copysign, pi, radians, degrees
+from math import cos, sin, nan, tan, copysign, pi, degrees
 
 import h5py
 import numpy as np
 from matplotlib import pyplot as plt
 from numpy.typing import NDArray
 
-from util import bin_index, bin_centers, wrap_angle, EARTH, inside_region, interp, offset_from_angle, expand
+from util import bin_index, bin_centers, wrap_angle, EARTH, inside_region, interp, offset_from_angle, expand, \
+	split_at_antimeridian, to_cartesian
 
 # the amount of space around each Section's valid region where the mesh should be defined
 MARGIN = 1.0
@@ -47,13 +48,18 @@ class Section:
 		if not (left_border[0, 0] == rite_border[0, 0] and left_border[0, 1] == rite_border[0, 1]):
 			raise ValueError("the borders are supposed to start at the same point")
 
-		self.cut_border = np.concatenate([left_border[:0:-1, :], rite_border])
+		# split the borders at the antimeridian now so that we never have to unwrap them later
+		self.cut_border = split_at_antimeridian(
+			np.concatenate([left_border[:0:-1, :], rite_border]))
 		self.glue_tripoint = glue_tripoint
-		self.glue_border = construct_path_through(self.cut_border[-1, :],
-		                                          self.glue_tripoint,
-		                                          self.cut_border[0, :])
+		self.glue_border = split_at_antimeridian(
+			construct_path_through(self.cut_border[-1, :],
+			                       self.glue_tripoint,
+			                       self.cut_border[0, :]))
 
 		self.border = np.concatenate([self.cut_border[:-1, :], self.glue_border])
+		# the center is needed for both projecting and plotting, so only find it once
+		self.center = np.degrees(center_of(np.radians(self.border)))
 
 
 def construct_path_through(start: NDArray[float], middle: NDArray[float], end: NDArray[float]
@@ -128,23 +134,32 @@ def center_of(border: NDArray[float]) -> tuple[float, float]:
 	"""
 	ф_sample = np.linspace(-pi/2, pi/2, 25)
 	λ_sample = np.linspace(-pi, pi, 48, endpoint=False)
-	opposes_inside = inside_region(
-		-ф_sample, wrap_angle(λ_sample + pi, period=2*pi), border, period=2*pi)
-	max_distance = np.where(opposes_inside, inf, 0)
-	distance, _ = rotated_coordinates(
-		ф_sample[:, np.newaxis, np.newaxis],
-		λ_sample[np.newaxis, :, np.newaxis],
-		border[np.newaxis, np.newaxis, :, 0],
-		border[np.newaxis, np.newaxis, :, 1])
-	max_distance = np.maximum(max_distance, np.max(distance, axis=2))
-	best_i, best_j = np.unravel_index(np.argmin(max_distance), max_distance.shape)
-	return ф_sample[best_i], λ_sample[best_j]
+	# the farthest border point is the one with the smallest dot product with the sample point
+	sample_directions = np.stack(np.broadcast_arrays(*to_cartesian(
+		np.degrees(ф_sample)[:, np.newaxis], np.degrees(λ_sample)[np.newaxis, :])), axis=-1)
+	border_directions = np.stack(to_cartesian(np.degrees(border[:, 0]), np.degrees(border[:, 1])), axis=-1)
+	min_cos_distance = np.min(sample_directions@border_directions.T, axis=2).ravel()
+	row_size = λ_sample.size
+	ф_sample, λ_sample = (grid.ravel() for grid in np.meshgrid(ф_sample, λ_sample, indexing="ij"))
+	# the best sample is the first one whose antipode isn't inside the region.  that check is the
+	# slow part, so go thru the samples from best to worst and only check them a row at a time
+	order = np.argsort(-min_cos_distance, kind="stable")
+	for start in range(0, order.size, row_size):
+		batch = order[start:start + row_size]
+		opposes_inside = inside_region(
+			-ф_sample[batch], wrap_angle(λ_sample[batch] + pi, period=2*pi), border, period=2*pi)
+		if not np.all(opposes_inside):
+			best = batch[np.argmax(~opposes_inside)]
+			return ф_sample[best], λ_sample[best]
+	return ф_sample[0], λ_sample[0]
 
 
 def cells_touched_by(x_edges: NDArray[float], y_edges: NDArray[float],
                      path: NDArray[float], radius=0.) -> NDArray[bool]:
 	""" find and mark each tile binned by x_edges and y_edges that intersects this polygon path.
-	    tangency doesn't count.  assume the y domain is periodic but the x domain is not.
+	    tangency doesn't count.  assume the y domain is periodic but the x domain is not, and
+	    that the path only ever wraps around the y domain by jumping straight across it at a
+	    constant x (see split_at_antimeridian).
         :param x_edges: the bin edges for axis 0
         :param y_edges: the bin edges for axis 1
         :param path: a n×2 array of ordered x and y coordinates
@@ -152,29 +167,27 @@ def cells_touched_by(x_edges: NDArray[float], y_edges: NDArray[float],
         :return: a boolean grid with each touched cell marked True
 	"""
 	touched = np.full((x_edges.size - 1, y_edges.size - 1), False)
-	# look at each segment of the path
-	for l in range(path.shape[0] - 1):
-		x0, y0 = path[l, :]
-		x1, y1 = path[l + 1, :]
-		# find the places where it crosses vertical cell edges
-		if x0 != x1:
-			for dy in [-radius, radius]:
-				i_crossings, j_crossings = grid_intersections_with(
-					x_edges, y_edges, x0, y0 + dy, x1, y1 + dy, False, True)
-				# mark the cells adjacent to each crossing
-				touched[i_crossings, j_crossings] = True
-				touched[i_crossings - 1, j_crossings] = True
-		# find the places where it crosses horizontal cell edges
-		if y0 != y1:
-			for dx in [-radius, radius]:
-				j_crossings, i_crossings = grid_intersections_with(
-					y_edges, x_edges, y0, x0 + dx, y1, x1 + dx, True, False)
-				# watch out for out-of-bounds crossings if there's a nonzero radius
-				valid = (i_crossings >= 0) & (i_crossings < x_edges.size - 1)
-				i_crossings, j_crossings = i_crossings[valid], j_crossings[valid]
-				# mark the cells adjacent to each crossing
-				touched[i_crossings, j_crossings] = True
-				touched[i_crossings, j_crossings - 1] = True
+	# a path with no thickness only needs to be traced once in each direction
+	offsets = [-radius, radius] if radius > 0 else [0.]
+	# find the places where the path crosses vertical cell edges
+	x0, y0, x1, y1 = orient_segments(path[:, 0], path[:, 1], periodic_x=False)
+	for dy in offsets:
+		i_crossings, j_crossings = grid_intersections_with(
+			x_edges, y_edges, x0, y0 + dy, x1, y1 + dy)
+		# mark the cells adjacent to each crossing
+		touched[i_crossings, j_crossings] = True
+		touched[i_crossings - 1, j_crossings] = True
+	# find the places where the path crosses horizontal cell edges
+	y0, x0, y1, x1 = orient_segments(path[:, 1], path[:, 0], periodic_x=True)
+	for dx in offsets:
+		j_crossings, i_crossings = grid_intersections_with(
+			y_edges, x_edges, y0, x0 + dx, y1, x1 + dx)
+		# watch out for out-of-bounds crossings if there's a nonzero radius
+		valid = (i_crossings >= 0) & (i_crossings < x_edges.size - 1)
+		i_crossings, j_crossings = i_crossings[valid], j_crossings[valid]
+		# mark the cells adjacent to each crossing
+		touched[i_crossings, j_crossings] = True
+		touched[i_crossings, j_crossings - 1] = True
 	# also mark cells that contain vertices, as these won't always have crossings around them
 	on_edge = np.isin(path[:, 0], x_edges) | np.isin(path[:, 1], y_edges)
 	i = bin_index(path[:, 0], x_edges)
@@ -183,16 +196,15 @@ def cells_touched_by(x_edges: NDArray[float], y_edges: NDArray[float],
 
 	if radius > 0:
 		# finally, check for diagonal radius things that would otherwise be missed
-		for l in range(path.shape[0] - 2):
-			x, y = offset_from_angle(*path[l:l + 3], radius)  # type: ignore
-			i, j = bin_index(x, x_edges), bin_index(y, y_edges)
-			if i >= 0 and i < x_edges.size - 1:
-				touched[i, j] = True
+		before, vertices, after = path[:-2], path[1:-1], path[2:]
 		if np.array_equal(path[0], path[-1]):
-			x, y = offset_from_angle(path[-2], path[0], path[1], radius)
-			i, j = bin_index(x, x_edges), bin_index(y, y_edges)
-			if i >= 0 and i < x_edges.size - 1:
-				touched[i, j] = True
+			before = np.concatenate([before, path[-2:-1]])
+			vertices = np.concatenate([vertices, path[0:1]])
+			after = np.concatenate([after, path[1:2]])
+		x, y = offset_from_angle(before, vertices, after, radius).T
+		i, j = bin_index(x, x_edges), bin_index(y, y_edges)
+		in_bounds = (i >= 0) & (i < x_edges.size - 1)
+		touched[i[in_bounds], j[in_bounds]] = True
 
 	return touched
 
@@ -224,57 +236,54 @@ def cells_approached_by(x_edges: NDArray[float], y_edges: NDArray[float],
 	return approached
 
 
+def orient_segments(x: NDArray[float], y: NDArray[float], periodic_x: bool
+                    ) -> tuple[NDArray[float], NDArray[float], NDArray[float], NDArray[float]]:
+	""" break a path up into line segments and set them up for grid_intersections_with, by
+	    dropping any that jump across the periodic x axis and then making them all go left to
+	    rite.  the path must already be split at the antimeridian, so that the segments we drop
+	    are just straight jumps from one side to the other, which can't cross anything.
+	    :param x: the x coordinates of each vertex of the path
+	    :param y: the y coordinates of each vertex of the path
+	    :param periodic_x: whether the x axis must be treated as periodic
+	    :return: the x and y coordinates of the start of each segment, and the x and y
+	             coordinates of the end of each segment
+	"""
+	x0, y0 = x[:-1], y[:-1]
+	x1, y1 = x[1:], y[1:]
+	# make sure we don't have to worry about periodicity issues
+	keep = ~(periodic_x & (abs(x1 - x0) > 180))
+	x0, y0, x1, y1 = x0[keep], y0[keep], x1[keep], y1[keep]
+	# and we want to be able to assume they go left to rite
+	backward = x1 < x0
+	return (np.where(backward, x1, x0), np.where(backward, y1, y0),
+	        np.where(backward, x0, x1), np.where(backward, y0, y1))
+
+
 def grid_intersections_with(x_values: NDArray[float], y_edges: NDArray[float],
-                            x0: float, y0: float, x1: float, y1: float,
-                            periodic_x: bool, periodic_y: bool
+                            x0: NDArray[float], y0: NDArray[float], x1: NDArray[float], y1: NDArray[float]
                             ) -> tuple[NDArray[int], NDArray[int]]:
-	""" bin the y value at each point where this single line segment crosses one of
-	    the x_values.
-        :param x_values: the values at which we should detect and bin positions (must
-	                     be evenly spaced if periodic)
-	    :param y_edges: the edges of the bins in which to place y values (must be
-	                    evenly spaced if periodic)
-        :param x0: the x coordinate of the start of the line segment
-        :param y0: the y coordinate of the start of the line segment
-        :param x1: the x coordinate of the end of the line segment
-        :param y1: the y coordinate of the end of the line segment
-        :param periodic_x: whether the x axis must be treated as periodic
-        :param periodic_y: whether the y axis must be treated as periodic
+	""" bin the y value at each point where any of these line segments crosses one of
+	    the x_values.  the segments should come from orient_segments.
+        :param x_values: the values at which we should detect and bin positions
+	    :param y_edges: the edges of the bins in which to place y values
+        :param x0: the x coordinates of the start of each line segment
+        :param y0: the y coordinates of the start of each line segment
+        :param x1: the x coordinates of the end of each line segment (no less than x0)
+        :param y1: the y coordinates of the end of each line segment
 	    :return: the 1D array of x value indices and the 1D array of y bin indices
 	"""
-	# make sure we don't have to worry about periodicity issues
-	if periodic_x and abs(x1 - x0) > 180:
-		shift = bin_index(max(x0, x1), x_values)
-		x_step = x_values[1] - x_values[0]
-		i_crossings, j_crossings = grid_intersections_with(
-			x_values, y_edges,
-			wrap_angle(x0 - x_step*shift), y0,
-			wrap_angle(x1 - x_step*shift), y1,
-			periodic_x, periodic_y)
-		return (i_crossings + shift)%x_values.size, j_crossings
-	elif periodic_y and abs(y0 - y1) > 180:
-		shift = bin_index(max(y0, y1), y_edges)
-		y_step = y_edges[1] - y_edges[0]
-		i_crossings, j_crossings = grid_intersections_with(
-			x_values, y_edges,
-			x0, wrap_angle(y0 - y_step*shift),
-			x1, wrap_angle(y1 - y_step*shift),
-			periodic_x, periodic_y)
-		return i_crossings, (j_crossings + shift)%y_edges.size
-	# and we want to be able to assume they go left to rite
-	elif x1 < x0:
-		return grid_intersections_with(x_values, y_edges, x1, y1, x0, y0, periodic_x, periodic_y)
-	elif x1 > x0:
-		# if everything is set up like we expect...
-		i_first = bin_index(x0, x_values) + 1
-		i_last = bin_index(x1, x_values, right=True)
-		i_crossings = np.arange(i_first, i_last + 1)
-		x_crossings = x_values[i_crossings]
-		y_crossings = interp(x_crossings, x0, x1, y0, y1)
-		j_crossings = bin_index(y_crossings, y_edges)
-		return i_crossings, j_crossings
-	else:
-		return np.empty((0,), dtype=int), np.empty((0,), dtype=int)
+	# count how many x_values each segment crosses
+	i_first = bin_index(x0, x_values) + 1
+	i_last = bin_index(x1, x_values, right=True)
+	num_crossings = np.where(x1 > x0, np.maximum(0, i_last - i_first + 1), 0)
+	# then lay all of the crossings out in one flat array
+	segment = np.repeat(np.arange(x0.size), num_crossings)
+	i_crossings = np.arange(segment.size) - np.repeat(np.cumsum(num_crossings) - num_crossings, num_crossings)
+	i_crossings += i_first[segment]
+	x_crossings = x_values[i_crossings]
+	y_crossings = interp(x_crossings, x0[segment], x1[segment], y0[segment], y1[segment])
+	j_crossings = bin_index(y_crossings, y_edges)
+	return i_crossings, j_crossings
 
 
 def trim_to_grid(path: NDArray[float], x_edges: NDArray[float], y_edges: NDArray[float]
@@ -335,32 +344,34 @@ def line_square_intersection(x_out: float, y_out: float, x_in: float, y_in: floa
 	return x_intersect, y_intersect
 
 
-def oblique_stereographic_project(ф: NDArray[float], λ: NDArray[float],
+def oblique_stereographic_project(x: NDArray[float], y: NDArray[float], z: NDArray[float],
                                   section: Section) -> NDArray[float]:
 	""" apply a simple map projection meant to approximate the Elastic projection
 	    of this Section.  the projection should be conformal, reasonably undistorted
 	    within the section's borders, and project the section's glue_tripoint to the
 	    origin with true scale and orientation (so it's continuus with other sections).
-	    :param ф: the latitudes to project (degrees)
-	    :param λ: the longitudes to project (degrees)
+	    the points are given in cartesian coordinates so that the trig can be done once
+	    and reused for every section.
+	    :param x: the x coordinates of the points to project on the unit sphere
+	    :param y: the y coordinates of the points to project on the unit sphere
+	    :param z: the z coordinates of the points to project on the unit sphere
 	    :param section: the Section specifying the borders and glue_tripoint of the projection
-	    :return: an array of [x, y] pairs corresponding to ф and λ
+	    :return: an array of [x, y] pairs corresponding to the points
     """
-	ф, λ = np.radians(ф), np.radians(λ)
 	ф_gluepoint, λ_gluepoint = np.radians(section.glue_tripoint)  # convert everything to radians
-	ф_center, λ_center = center_of(np.radians(section.border))
+	ф_center, λ_center = np.radians(section.center)
 	p_transform, λ_transform = rotated_coordinates(
-		ф_center, λ_center, ф, λ)
+		ф_center, λ_center, x, y, z)
 	r, θ = np.tan(p_transform/2), λ_transform
 	# shift it so the shared point is at the origin for all sections
 	p_gluepoint, θ_gluepoint = rotated_coordinates(
-		ф_center, λ_center, ф_gluepoint, λ_gluepoint)
+		ф_center, λ_center, *to_cartesian(*section.glue_tripoint))
 	r_gluepoint = tan(p_gluepoint/2)
 	x1 =  r*np.sin(θ) - r_gluepoint*np.sin(θ_gluepoint)
 	y1 = -r*np.cos(θ) + r_gluepoint*np.cos(θ_gluepoint)
 	# rotate and scale it so it's locally continuus at the shared point
 	_, β_center = rotated_coordinates(
-		ф_gluepoint, λ_gluepoint, ф_center, λ_center)
+		ф_gluepoint, λ_gluepoint, *to_cartesian(*section.center))
 	scale = 3*EARTH.R*cos(p_gluepoint/2)**2
 	rotation = β_center - θ_gluepoint - pi
 	x2 = scale*(x1*cos(rotation) - y1*sin(rotation))
@@ -368,21 +379,23 @@ def oblique_stereographic_project(ф: NDArray[float], λ: NDArray[float],
 	return np.stack([x2, y2], axis=-1)
 
 
-def rotated_coordinates(ф_ref: float | NDArray[float], λ_ref: float | NDArray[float],
-                        ф1: float | NDArray[float], λ1: float | NDArray[float]
+def rotated_coordinates(ф_ref: float, λ_ref: float, x1: float | NDArray[float],
+                        y1: float | NDArray[float], z1: float | NDArray[float]
                         ) -> tuple[NDArray[float], NDArray[float]]:
 	""" return the polar distance and longitude relative to an oblique reference pole
 	    :param ф_ref: the absolute latitude of the new North Pole (radians)
 	    :param λ_ref: the absolute longitude of the new North Pole (radians)
-	    :param ф1: the latitude to adjust (radians)
-	    :param λ1: the longitude to adjust (radians)
-	    :return: the angular distance between (ф1,λ1) and (ф_ref,λ_ref) in radians, and
-	             the bearing that (ф1,λ1) is from (ф_ref,λ_ref) in radians
+	    :param x1: the x coordinate on the unit sphere of the point to adjust
+	    :param y1: the y coordinate on the unit sphere of the point to adjust
+	    :param z1: the z coordinate on the unit sphere of the point to adjust
+	    :return: the angular distance between (x1,y1,z1) and (ф_ref,λ_ref) in radians, and
+	             the bearing that (x1,y1,z1) is from (ф_ref,λ_ref) in radians
 	"""
-	x_rotate = np.sin(ф_ref)*np.cos(ф1)*np.cos(λ1 - λ_ref) - np.cos(ф_ref)*np.sin(ф1)
-	y_rotate = np.cos(ф1)*np.sin(λ1 - λ_ref)
-	z_rotate = np.cos(ф_ref)*np.cos(ф1)*np.cos(λ1 - λ_ref) + np.sin(ф_ref)*np.sin(ф1)
-	p_rotate = pi/2 - np.arctan2(z_rotate, np.hypot(x_rotate, y_rotate))
+	meridional = cos(λ_ref)*x1 + sin(λ_ref)*y1
+	x_rotate = sin(ф_ref)*meridional - cos(ф_ref)*z1
+	y_rotate = cos(λ_ref)*y1 - sin(λ_ref)*x1
+	z_rotate = cos(ф_ref)*meridional + sin(ф_ref)*z1
+	p_rotate = np.arccos(np.clip(z_rotate, -1, 1))  # (x, y, z) is a unit vector, so z alone gives the distance
 	λ_rotate = np.arctan2(y_rotate, x_rotate)
 	return p_rotate, λ_rotate
 
@@ -391,15 +404,16 @@ def resolve_path(фs: NDArray[float], λs: NDArray[float],
                  resolution: float) -> tuple[NDArray[float], NDArray[float]]:
 	""" refine a path such that its segments are no longer than resolution """
 	assert фs.size == λs.size
-	new_фs, new_λs = [фs[0]], [λs[0]]
-	for i in range(1, фs.size):
-		if abs(λs[i] - λs[i - 1]) <= 180:
-			distance = hypot(фs[i] - фs[i - 1], λs[i] - λs[i - 1])
-			segment_points = np.linspace(0, 1, ceil(distance/resolution) + 1)[1:]
-			for t in segment_points:
-				new_фs.append((1 - t)*фs[i - 1] + t*фs[i])
-				new_λs.append((1 - t)*λs[i - 1] + t*λs[i])
-	return np.array(new_фs), np.array(new_λs)
+	# decide how many points to put on each segment (skipping any that jump across the antimeridian)
+	distance = np.hypot(np.diff(фs), np.diff(λs))
+	num_points = np.where(abs(np.diff(λs)) <= 180, np.ceil(distance/resolution), 0).astype(int)
+	# then lay them all out at once
+	segment = np.repeat(np.arange(num_points.size), num_points)
+	k = np.arange(1, segment.size + 1) - np.repeat(np.cumsum(num_points) - num_points, num_points)
+	t = np.where(k == num_points[segment], 1, k*(1/num_points[segment]))
+	new_фs = (1 - t)*фs[segment] + t*фs[segment + 1]
+	new_λs = (1 - t)*λs[segment] + t*λs[segment + 1]
+	return np.concatenate([фs[:1], new_фs]), np.concatenate([λs[:1], new_λs])
 
 
 def load_interruptions(filename: str) -> tuple[NDArray[float], list[NDArray[float]]]:
@@ -438,10 +452,12 @@ def save_mesh(filename: str, ф: NDArray[float], λ: NDArray[float],
 
 	with h5py.File(filename, "w") as file:
 		file.attrs["num_sections"] = num_sections
+		# the sections all share the same latitudes and longitudes, so only save them once
+		file.create_dataset("latitude", data=ф)
+		file.create_dataset("longitude", data=λ)
 		for h in range(num_sections):
-			file.create_dataset(f"section{h}/latitude", data=ф)
-			file.create_dataset(f"section{h}/longitude", data=λ)
-			file.create_dataset(f"section{h}/projection", data=nodes[h, :, :, :])
+			file.create_dataset(f"section{h}/projection", data=nodes[h, :, :, :],
+			                    chunks=nodes.shape[1:], compression="lzf")
 			file.create_dataset(f"section{h}/border", data=sections[h].border)
 
 
@@ -469,11 +485,19 @@ def build_mesh(name: str, resolution: int):
 	for h in range(len(interruptions)):
 		sections.append(Section(interruptions[h - 1], interruptions[h], glue_tripoint))
 
-	# create the node array
-	nodes = np.full((len(sections), num_ф + 1, num_λ + 1, 2), nan)
+	# create the node array (single precision is plenty, since these are just an initial guess)
+	nodes = np.full((len(sections), num_ф + 1, num_λ + 1, 2), nan, dtype=np.float32)
 	include_nodes = np.full((len(sections), num_ф + 1, num_λ + 1), False)
 	share_cells = np.full((num_ф, num_λ), False)
 
+	# set up the things we need to check for straits
+	ф_strait, λ_strait = np.transpose(STRAITS)
+	cos_ф_strait = np.cos(np.radians(ф_strait))
+	ф_grid = bin_centers(ф)[:, np.newaxis, np.newaxis]
+	λ_grid = bin_centers(λ)[np.newaxis, :, np.newaxis]
+	# and the trig we need to project the nodes, which is the same for every section
+	x_nodes, y_nodes, z_nodes = np.broadcast_arrays(*to_cartesian(ф[:, np.newaxis], λ[np.newaxis, :]))
+
 	# for each section
 	for h, section in enumerate(sections):
 		# get the main bitmaps of merit from its border
@@ -499,24 +523,24 @@ def build_mesh(name: str, resolution: int):
 		# add in any straits that happen to be split across its edge
 		ф_border, λ_border = resolve_path(section.cut_border[:, 0], section.cut_border[:, 1],
 		                                  STRAIT_RADIUS)
-		for ф_strait, λ_strait in STRAITS:
-			border_near_strait = \
-				(abs(ф_border - ф_strait) < STRAIT_RADIUS/2) & \
-				(abs(wrap_angle(λ_border - λ_strait)) < STRAIT_RADIUS/2/cos(radians(ф_strait)))
-			if np.any(border_near_strait):
-				ф_grid = bin_centers(ф)[:, np.newaxis]
-				λ_grid = bin_centers(λ)[np.newaxis, :]
-				cell_near_strait = \
-					(abs(ф_grid - ф_strait) < STRAIT_RADIUS) & \
-					(abs(wrap_angle(λ_grid - λ_strait)) < STRAIT_RADIUS/cos(radians(ф_strait)))
-				include_cells[cell_near_strait] = True
+		border_near_strait = \
+			(abs(ф_border[:, np.newaxis] - ф_strait) < STRAIT_RADIUS/2) & \
+			(abs(wrap_angle(λ_border[:, np.newaxis] - λ_strait)) < STRAIT_RADIUS/2/cos_ф_strait)
+		split = np.any(border_near_strait, axis=0)
+		if np.any(split):
+			cell_near_strait = \
+				(abs(ф_grid - ф_strait[split]) < STRAIT_RADIUS) & \
+				(abs(wrap_angle(λ_grid - λ_strait[split])) < STRAIT_RADIUS/cos_ф_strait[split])
+			include_cells |= np.any(cell_near_strait, axis=2)
 
 		include_nodes[h, :, :] = expand(include_cells, 1, account_for_periodicity=False)
 
 		# and create an oblique stereographic projection just for it
-		nodes[h, include_nodes[h, :, :], :] = oblique_stereographic_project(
-			ф[:, np.newaxis], λ[np.newaxis, :], section
-		)[include_nodes[h, :, :], :]
+		# (only bother projecting the nodes that are actually included)
+		i_include, j_include = np.nonzero(include_nodes[h, :, :])
+		nodes[h, i_include, j_include, :] = oblique_stereographic_project(
+			x_nodes[i_include, j_include], y_nodes[i_include, j_include], z_nodes[i_include, j_include],
+			section)
 
 		# plot it
 		plt.figure(f"{name.capitalize()} mesh, section {h}")
@@ -524,7 +548,7 @@ def build_mesh(name: str, resolution: int):
 		           extent=(-180, 180, -90, 90), origin="lower", vmin=-1)
 		plt.plot(section.border[:, 1], section.border[:, 0], "k")
 		plt.scatter(section.cut_border[[0, -1], 1], section.cut_border[[0, -1], 0], c="k", s=20)
-		plt.scatter(*np.degrees(center_of(np.radians(section.border)))[::-1], c="k", s=50, marker="x")
+		plt.scatter(*section.center[::-1], c="k", s=50, marker="x")
 		for фi in ф:
 			plt.axhline(фi, color="k", linewidth=".6")
 		for λj in λ:
@@ -533,10 +557,12 @@ def build_mesh(name: str, resolution: int):
 	share_nodes = expand(share_cells, 1, account_for_periodicity=True)
 
 	# finally, blend the sections together at their boundaries
-	mean_nodes = np.tile(np.nanmean(nodes, axis=0), (len(sections), 1, 1, 1))
-	nodes[include_nodes & share_nodes, :] = mean_nodes[include_nodes & share_nodes, :]
-	# and assert the identity of the poles and antimeridian
 	node_exists = np.all(np.isfinite(nodes), axis=3)
+	num_nodes = np.sum(node_exists, axis=0)[:, :, np.newaxis]
+	mean_nodes = np.sum(np.where(node_exists[:, :, :, np.newaxis], nodes, 0), axis=0)/np.maximum(num_nodes, 1)
+	blend_nodes = include_nodes & share_nodes
+	nodes[blend_nodes, :] = np.broadcast_to(mean_nodes, nodes.shape)[blend_nodes, :]
+	# and assert the identity of the poles and antimeridian
 	for i_pole in [0, -1]:
 		if np.any(share_nodes[i_pole, :]):
 			h_divisions = [[h for h in range(nodes.shape[0])]]
@@ -13,7 +13,7 @@ import os
 import re
 import sys
 import threading
-from math import inf, pi, log, nan, floor, isfinite, isnan, sqrt, radians, cos
+from math import inf, pi, log, nan, floor, isfinite, isnan, sqrt, radians
 from typing import Iterable, Sequence, Union, Optional
 
 import h5py
@@ -21,10 +21,11 @@ import numpy as np
 import shapefile
 import tifffile
 from matplotlib import pyplot as plt
+from matplotlib.collections import LineCollection
 from matplotlib.colors import LogNorm
 from numpy import newaxis
 from numpy.typing import NDArray
-from scipy.interpolate import RegularGridInterpolator
+from scipy.ndimage import map_coordinates
 
 from cmap import CUSTOM_CMAP
 from optimize import minimize_with_bounds
@@ -86,14 +87,23 @@ def create_map_projection(configuration_file: str):
 	# and then do the same thing for cell corners
 	cell_definitions, [cell_shape_weights, cell_scale_weights] = enumerate_cells(
 		node_indices, [shape_weights, scale_weights], dΦ, dΛ)
+	# the set of cells is fixed from here on out, so look up each one's dimensions now rather than in every energy call
+	# (and invert them now too, so the energy calls can multiply instead of dividing)
+	inverse_cell_dΦ, inverse_cell_dΛ = 1/dΦ[cell_definitions[:, 1]], 1/dΛ[cell_definitions[:, 1]]
+	# (the lenient energy only needs single precision for its line searches, which makes the gathers much cheaper)
+	inverse_cell_dΦ_single = inverse_cell_dΦ.astype(np.float32)
+	inverse_cell_dΛ_single = inverse_cell_dΛ.astype(np.float32)
 
 	# set up the fitting constraints that will force the map to fit inside a box
 	logging.info(f"projecting section boundaries...")
 	boundary_matrix = project_section_boundaries(index_mesh, CONSTRAINT_RESOLUTION)
 	map_size = np.array([width, height])
 
-	# load the coastline data from Natural Earth
-	coastlines = load_coastline_data()
+	# load the coastline data from Natural Earth, and convert it to fractional mesh indices once so it's quick to redraw
+	# (all strung together with nans in between so they can be drawn as a single line)
+	coastlines = np.concatenate([np.concatenate([line, [[nan, nan]]]) for line in load_coastline_data()])
+	coastlines = np.stack([(coastlines[:, 0] - mesh.ф[0])/(mesh.ф[1] - mesh.ф[0]),
+	                       (coastlines[:, 1] - mesh.λ[0])/(mesh.λ[1] - mesh.λ[0])])
 
 	# now we can bild up the progression schedule
 	skeleton_factors = np.round(np.geomspace(
@@ -113,19 +123,31 @@ def create_map_projection(configuration_file: str):
 	main_fig, map_axes = plt.subplots(figsize=(7, 5), num=f"Elastic {configuration_file}")
 
 	current_state = node_positions
+	shown_state = None
 	current_positions = node_positions
 	latest_step = np.zeros_like(node_positions)
 	values, grads = [], []
 	thread_lock = False
+	last_state, last_positions = None, None
+
+	def restore_positions(state: NDArray[float]) -> NDArray[float]:
+		# the reporter almost always asks about the state that was just evaluated, so remember the last one
+		nonlocal last_state, last_positions
+		if type(state) is not np.ndarray:
+			return restore @ state
+		if state is not last_state:
+			last_state, last_positions = state, restore @ state
+		return last_positions
 
 	# define the objective functions
 	def compute_energy_aggressive(positions: NDArray[float]) -> float:
 		# one that aggressively pushes the mesh to have all positive strains
-		a, b = compute_principal_strains(restore @ positions,
-		                                 cell_definitions, dΦ, dΛ)
-		if np.all(a > 0) and np.all(b > 0):
+		a, b = compute_principal_strains(restore_positions(positions),
+		                                 cell_definitions, inverse_cell_dΦ, inverse_cell_dΛ)
+		# (a is never less than b, so checking b is enuff)
+		if np.all(b > 0):
 			return -inf
-		elif np.any(a < -100) or np.any(b < -100):
+		elif np.any(b < -100):
 			return inf
 		else:
 			a_term = np.exp(-10*a)
@@ -134,17 +156,22 @@ def create_map_projection(configuration_file: str):
 
 	def compute_energy_lenient(positions: NDArray[float]) -> float:
 		# one that approximates the true cost function without requiring positive strains
-		a, b = compute_principal_strains(restore @ positions,
-		                                 cell_definitions, dΦ, dΛ)
+		if type(positions) is np.ndarray:
+			# (it has no barrier, so when we don't need the gradient, single precision is plenty)
+			a, b = compute_principal_strains(restore_positions(positions).astype(np.float32),
+			                                 cell_definitions, inverse_cell_dΦ_single, inverse_cell_dΛ_single)
+		else:
+			a, b = compute_principal_strains(restore_positions(positions),
+			                                 cell_definitions, inverse_cell_dΦ, inverse_cell_dΛ)
 		scale_term = (a + b - 2)**2
 		shape_term = (a - b)**2
 		return (scale_term*cell_scale_weights + 2*shape_term*cell_shape_weights).sum()
 
 	def compute_energy_strict(positions: NDArray[float]) -> float:
 		# and one that throws an error when any strains are negative
-		a, b = compute_principal_strains(restore @ positions,
-		                                 cell_definitions, dΦ, dΛ)
-		if np.any(a <= 0) or np.any(b <= 0):
+		a, b = compute_principal_strains(restore_positions(positions),
+		                                 cell_definitions, inverse_cell_dΦ, inverse_cell_dΛ)
+		if np.any(b <= 0):  # (a is never less than b, so checking b is enuff)
 			return inf
 		else:
 			ab = a*b
@@ -157,7 +184,7 @@ def create_map_projection(configuration_file: str):
 		while thread_lock: pass
 		thread_lock = True
 		current_state = state
-		current_positions = restore @ state
+		current_positions = restore_positions(state)
 		latest_step = step
 		values.append(value)
 		grads.append(np.linalg.norm(grad)*EARTH.R)
@@ -179,6 +206,7 @@ def create_map_projection(configuration_file: str):
 			gradient_tolerance = 1e-4/EARTH.R
 			barrier_tolerance = 1e-3*EARTH.R
 			reduce, restore = Scalar(1), Scalar(1)
+		last_state, last_positions = None, None  # forget any positions restored with the old skeleton
 
 		# progress from coarser to finer feasible set polytopes
 		if bounds_coarseness == 0:
@@ -230,18 +258,21 @@ def create_map_projection(configuration_file: str):
 		calculation = threading.Thread(target=calculate)
 		calculation.start()
 		while calculation.is_alive():
-			while thread_lock: pass
-			thread_lock = True
-			show_projection(current_state, current_positions,
-			                latest_step, values, grads,
-			                index_mesh, dΦ, dΛ,
-			                cell_definitions, cell_scale_weights,
-			                coastlines, boundary_matrix, width, height,
-			                map_axes, hist_axes, valu_axes, diff_axes,
-			                show_axes=True, show_distortion=False)
-			thread_lock = False
-			main_fig.canvas.draw()
-			small_fig.canvas.draw()
+			# don't bother redrawing if the optimizer hasn't reported anything new
+			if current_state is not shown_state:
+				while thread_lock: pass
+				thread_lock = True
+				show_projection(current_state, current_positions,
+				                latest_step, values, grads,
+				                index_mesh, inverse_cell_dΦ, inverse_cell_dΛ,
+				                cell_definitions, cell_scale_weights,
+				                coastlines, boundary_matrix, width, height,
+				                map_axes, hist_axes, valu_axes, diff_axes,
+				                show_axes=True, show_distortion=False)
+				shown_state = current_state
+				thread_lock = False
+				main_fig.canvas.draw()
+				small_fig.canvas.draw()
 			plt.pause(2)
 		if not success:
 			small_fig.canvas.manager.set_window_title("Error!")
@@ -278,7 +309,7 @@ def create_map_projection(configuration_file: str):
 	# plot and save the final version of the mesh
 	for show_distortion in [False, True]:  # both with and without shading for scale
 		show_projection(None, node_positions, None, values, grads,
-		                mesh, dΦ, dΛ,
+		                mesh, inverse_cell_dΦ, inverse_cell_dΛ,
 		                cell_definitions, cell_scale_weights,
 		                coastlines, boundary, width, height,
 		                map_axes, hist_axes, valu_axes, diff_axes,
@@ -313,8 +344,11 @@ def enumerate_nodes(mesh: NDArray[float]) -> tuple[NDArray[int], NDArray[float]]
 	    returning mappings from the old mesh to the new indices and the n×2 list positions
 	"""
 	# first flatten and sort the positions
-	node_positions = mesh.reshape((-1, mesh.shape[-1]))
-	node_positions, node_indices = np.unique(node_positions, axis=0, return_inverse=True)
+	node_positions = np.ascontiguousarray(mesh.reshape((-1, 2)))
+	# (viewing each row as one complex number lets unique do a plain 1D sort, which is much faster)
+	node_records = node_positions.view(f"c{2*mesh.dtype.itemsize}").ravel()
+	node_records, node_indices = np.unique(node_records, return_inverse=True)
+	node_positions = node_records.view(mesh.dtype).reshape((-1, 2))
 	node_indices = node_indices.reshape(mesh.shape[:-1])
 
 	# then remove any nans, which in fact represent the absence of a node
@@ -343,38 +377,45 @@ def enumerate_cells(node_indices: NDArray[int], values: list[NDArray[float] | li
 	"""
 	# start off by resampling these in a useful way
 	for k in range(len(values)):
+		resampled = np.empty(node_indices.shape, dtype=float)
 		for h in range(node_indices.shape[0]):
-			values[k][h] = downsample(values[k][h], node_indices.shape[1:])
-		values[k] = np.stack(values[k])
+			downsample(values[k][h], node_indices.shape[1:], out=resampled[h, :, :])
+		values[k] = resampled
 
 	# assemble a list of all possible cells
 	h, i, j = index_grid((node_indices.shape[0],
 	                      node_indices.shape[1] - 1,
 	                      node_indices.shape[2] - 1))
 	h, i, j = h.ravel(), i.ravel(), j.ravel()
-	cell_definitions = np.empty((0, 9), dtype=int)
-	cell_values = [np.empty((0,), dtype=float)]*len(values)
+	cell_definitions = np.empty((4, h.size, 9), dtype=int)
+	cell_values = [np.empty((4, h.size), dtype=float) for _ in values]
 	for di in range(0, 2):
 		for dj in range(0, 2):
 			# define them by their indices and neiboring node indices
+			corner = 2*di + dj
 			west_node = node_indices[h, i + di, j]
 			east_node = node_indices[h, i + di, j + 1]
 			south_node = node_indices[h, i,     j + dj]
 			north_node = node_indices[h, i + 1, j + dj]
-			cell_definitions = np.concatenate([
-				cell_definitions,
-				np.stack([i + di, i + 1 - di, # these first two will get chopd off once I'm done with them
-				          h, i + di, j + dj, # these middle three are for generic spacially dependent stuff
-				          west_node, east_node, # these bottom four are the really important indices
-				          south_node, north_node], axis=-1)])
+			np.stack([i + di, i + 1 - di, # these first two will get chopd off once I'm done with them
+			          h, i + di, j + dj, # these middle three are for generic spacially dependent stuff
+			          west_node, east_node, # these bottom four are the really important indices
+			          south_node, north_node], axis=-1, out=cell_definitions[corner, :, :])
 			for k in range(len(values)):
-				cell_values[k] = np.concatenate([
-					cell_values[k],
-					values[k][h, i, j],
-				])
-
-	# then remove all duplicates
-	_, unique_indices, final_indices = np.unique(cell_definitions[:, -4:], axis=0, return_index=True, return_inverse=True)
+				cell_values[k][corner, :] = values[k][h, i, j]
+	cell_definitions = cell_definitions.reshape((-1, 9))
+	cell_values = [cell_values[k].ravel() for k in range(len(values))]
+
+	# then remove all duplicates (packing each set of four node indices into one int if we can, since
+	# sorting one column is a lot faster than sorting four)
+	bits_per_node = int(np.max(cell_definitions[:, -4:]) + 1).bit_length()  # (add 1 to make the -1s nonnegative)
+	if 4*bits_per_node < 64:
+		keys = np.zeros(cell_definitions.shape[0], dtype=np.int64)
+		for k in range(-4, 0):
+			keys = (keys << bits_per_node) | (cell_definitions[:, k] + 1)
+		_, unique_indices, final_indices = np.unique(keys, return_index=True, return_inverse=True)
+	else:
+		_, unique_indices, final_indices = np.unique(cell_definitions[:, -4:], axis=0, return_index=True, return_inverse=True)
 	for k in range(len(values)):
 		cell_values[k], _ = np.histogram(final_indices, np.arange(final_indices.max() + 2),
 		                                 weights=cell_values[k]) # make sure to add corresponding cell values
@@ -390,7 +431,8 @@ def enumerate_cells(node_indices: NDArray[int], values: list[NDArray[float] | li
 	# you can pull apart the cell definitions now
 	cell_node1_is = cell_definitions[:, 0]
 	cell_node2_is = cell_definitions[:, 1]
-	cell_definitions = cell_definitions[:, 2:]
+	# (store them column by column, since the columns are what get used as indices in the energy function)
+	cell_definitions = np.asfortranarray(cell_definitions[:, 2:])
 
 	# finally, calculate their areas and stuff
 	A_1 = dΦ[cell_node1_is]*dΛ[cell_node1_is]
@@ -423,44 +465,37 @@ def mesh_skeleton(lookup_table: Mesh, factor: int) -> tuple[Tensor, Tensor]:
 	west_neibor = np.full(n_full, -1)
 	north_neibor = np.full(n_full, -1)
 	south_neibor = np.full(n_full, -1)
-	for h in range(lookup_table.nodes.shape[0]):
-		for i in range(lookup_table.nodes.shape[1]):
-			for j in range(lookup_table.nodes.shape[2]):
-				if lookup_table.nodes[h, i, j] != -1:
-					if j - 1 >= 0 and lookup_table.nodes[h, i, j - 1] != -1:
-						west_neibor[lookup_table.nodes[h, i, j]] = lookup_table.nodes[h, i, j - 1]
-					if j + 1 < lookup_table.nodes.shape[2] and lookup_table.nodes[h, i, j + 1] != -1:
-						east_neibor[lookup_table.nodes[h, i, j]] = lookup_table.nodes[h, i, j + 1]
-					if i - 1 >= 0 and lookup_table.nodes[h, i - 1, j] != -1:
-						south_neibor[lookup_table.nodes[h, i, j]] = lookup_table.nodes[h, i - 1, j]
-					if i + 1 < lookup_table.nodes.shape[1] and lookup_table.nodes[h, i + 1, j] != -1:
-						north_neibor[lookup_table.nodes[h, i, j]] = lookup_table.nodes[h, i + 1, j]
+	nodes = lookup_table.nodes
+	exists = nodes != -1
+	connected = exists[:, :, :-1] & exists[:, :, 1:]
+	east_neibor[nodes[:, :, :-1][connected]] = nodes[:, :, 1:][connected]
+	west_neibor[nodes[:, :, 1:][connected]] = nodes[:, :, :-1][connected]
+	connected = exists[:, :-1, :] & exists[:, 1:, :]
+	north_neibor[nodes[:, :-1, :][connected]] = nodes[:, 1:, :][connected]
+	south_neibor[nodes[:, 1:, :][connected]] = nodes[:, :-1, :][connected]
 
 	# then decide which nodes should be independently defined in the skeleton
 	has_defined_neibors = np.full(n_full + 1, False) # (this array has an extra False at the end so that -1 works nicely)
 	is_defined = np.full(n_full, False)
 	# start by marking some evenly spaced interior points
 	if factor >= 1.5:
-		num_ф = max(3, floor((lookup_table.nodes.shape[1] - 1)/factor))
+		num_ф = max(3, floor((nodes.shape[1] - 1)/factor))
 		important_ф = np.linspace(-90, 90, num_ф, endpoint=False)
-		important_i = np.round((important_ф + 90)*(lookup_table.nodes.shape[1] - 1)/180)
+		important_i = np.round((important_ф + 90)*(nodes.shape[1] - 1)/180)
 	else:
-		important_i = np.arange(lookup_table.nodes.shape[1])
-	for h in range(lookup_table.nodes.shape[0]):
-		for i in range(lookup_table.nodes.shape[1]):
-			cosф = cos(radians(lookup_table.ф[i]))
-			num_λ = max(4, round((lookup_table.nodes.shape[2] - 1)/factor*cosф))
-			if num_λ <= lookup_table.nodes.shape[2]/1.5:
-				important_λ = np.linspace(0, 360, num_λ, endpoint=False)
-				important_j = np.round(important_λ*(lookup_table.nodes.shape[2] - 1)/360)
-			else:
-				important_j = np.arange(lookup_table.nodes.shape[2])
-			for j in range(lookup_table.nodes.shape[2]):
-				if lookup_table.nodes[h, i, j] != -1:
-					important_row = i in important_i
-					important_col = j in important_j
-					has_defined_neibors[lookup_table.nodes[h, i, j]] |= important_row
-					is_defined[lookup_table.nodes[h, i, j]] |= important_col
+		important_i = np.arange(nodes.shape[1])
+	important_row = np.isin(np.arange(nodes.shape[1]), important_i)
+	# (the number of key nodes on each parallel only depends on its latitude, so do them all at once)
+	num_λ = np.maximum(4, np.round((nodes.shape[2] - 1)/factor*np.cos(np.radians(lookup_table.ф)))).astype(int)
+	k = np.arange(np.max(num_λ))[np.newaxis, :]
+	important_λ = k*(360/num_λ[:, np.newaxis])
+	important_j = np.round(important_λ*(nodes.shape[2] - 1)/360).astype(int)
+	is_real = k < num_λ[:, np.newaxis]
+	important_col = np.zeros(nodes.shape[1:], dtype=bool)
+	important_col[np.nonzero(is_real)[0], important_j[is_real]] = True
+	important_col[num_λ > nodes.shape[2]/1.5, :] = True
+	has_defined_neibors[nodes[exists & important_row[np.newaxis, :, np.newaxis]]] = True
+	is_defined[nodes[exists & important_col[np.newaxis, :, :]]] = True
 	# then make sure we define enuff points at each edge to keep it all fully defined
 	has_defined_neibors[:-1] |= (north_neibor == -1) | (south_neibor == -1)
 	is_defined |= (~has_defined_neibors[east_neibor]) | (~has_defined_neibors[west_neibor])
@@ -471,11 +506,15 @@ def mesh_skeleton(lookup_table: Mesh, factor: int) -> tuple[Tensor, Tensor]:
 
 	# then decide how to define the ones that aren't defined
 	n_reference, n_distance = follow_graph(north_neibor, frum=np.arange(n_full), until=has_defined_neibors)
-	ne_reference, ne_distance = follow_graph(east_neibor, frum=n_reference, until=is_defined)
-	nw_reference, nw_distance = follow_graph(west_neibor, frum=n_reference, until=is_defined)
 	s_reference, s_distance = follow_graph(south_neibor, frum=np.arange(n_full), until=has_defined_neibors)
-	se_reference, se_distance = follow_graph(east_neibor, frum=s_reference, until=is_defined)
-	sw_reference, sw_distance = follow_graph(west_neibor, frum=s_reference, until=is_defined)
+	# (the north and south sides can walk east and west together, since they follow the same graffs)
+	ns_reference = np.concatenate([n_reference, s_reference])
+	e_reference, e_distance = follow_graph(east_neibor, frum=ns_reference, until=is_defined)
+	w_reference, w_distance = follow_graph(west_neibor, frum=ns_reference, until=is_defined)
+	ne_reference, se_reference = e_reference[:n_full], e_reference[n_full:]
+	ne_distance, se_distance = e_distance[:n_full], e_distance[n_full:]
+	nw_reference, sw_reference = w_reference[:n_full], w_reference[n_full:]
+	nw_distance, sw_distance = w_distance[:n_full], w_distance[n_full:]
 	n_weit, s_weit = get_interpolation_weights(n_distance, s_distance)
 	ne_weit, nw_weit = get_interpolation_weights(ne_distance, nw_distance)
 	se_weit, sw_weit = get_interpolation_weights(se_distance, sw_distance)
@@ -490,7 +529,8 @@ def mesh_skeleton(lookup_table: Mesh, factor: int) -> tuple[Tensor, Tensor]:
 	], axis=1)
 
 	# put the conversions together and return them as functions
-	reduction = SparseNDArray.identity(n_full)[is_defined, :]
+	reduction = SparseNDArray.from_coordinates(
+		[n_full], np.nonzero(is_defined)[0][:, newaxis, newaxis], np.ones((n_partial, 1)))
 	restoration = SparseNDArray.from_coordinates(
 		[n_partial], np.expand_dims(reindex[defining_indices], axis=-1), defining_weits)
 	return reduction, restoration
@@ -504,13 +544,15 @@ def follow_graph(progression: NDArray[int], frum: NDArray[int], until: NDArray[f
 	"""
 	state = frum.copy()
 	distance_traveld = np.zeros(state.shape)
-	arrived = until[state]
-	while np.any(~arrived):
-		if np.any((~arrived) & (progression[state] == state)):
+	# keep track of which ones are still moving so we only ever touch those
+	moving = np.nonzero(~until[state])[0]
+	while moving.size > 0:
+		next_state = progression[state[moving]]
+		if np.any(next_state == state[moving]):
 			raise ValueError("this importance graff was about to cause an infinite loop.")
-		state[~arrived] = progression[state[~arrived]]
-		distance_traveld[~arrived] += 1
-		arrived = until[state]
+		state[moving] = next_state
+		distance_traveld[moving] += 1
+		moving = moving[~until[next_state]]
 	return state, distance_traveld
 
 
@@ -528,27 +570,34 @@ def get_interpolation_weights(distance_a: NDArray[int], distance_b: NDArray[int]
 
 def compute_principal_strains(positions: NDArray[float],
                               cell_definitions: NDArray[int],
-                              dΦ: NDArray[float], dΛ: NDArray[float]
+                              inverse_dΦ: NDArray[float], inverse_dΛ: NDArray[float]
                               ) -> tuple[NDArray[float], NDArray[float]]:
 	""" take a set of cell definitions and 2D coordinates for each node, and calculate
 	    the Tissot-ellipse semiaxes of each cell.
 	    :param positions: the vector specifying the location of each node in the map plane
 	    :param cell_definitions: the list of cells, each defined by seven indices
-	    :param dΦ: the distance between adjacent rows of nodes (km)
-	    :param dΛ: the distance between adjacent nodes in each row (km)
+	    :param inverse_dΦ: the reciprocal of the distance between the south and north nodes of each cell (1/km)
+	    :param inverse_dΛ: the reciprocal of the distance between the west and east nodes of each cell (1/km)
 	    :return: the major primary strains, and the minor primary strains
 	"""
-	i = cell_definitions[:, 1]
+	if type(positions) is np.ndarray:
+		# when there's no autodiff to worry about, gathering each coordinate separately is much faster
+		x, y = positions[:, 0], positions[:, 1]
+		west, east = cell_definitions[:, 3], cell_definitions[:, 4]
+		south, north = cell_definitions[:, 5], cell_definitions[:, 6]
+		dxdΛ, dydΛ = (x[east] - x[west])*inverse_dΛ, (y[east] - y[west])*inverse_dΛ
+		dxdΦ, dydΦ = (x[north] - x[south])*inverse_dΦ, (y[north] - y[south])*inverse_dΦ
 
-	west = positions[cell_definitions[:, 3], :]
-	east = positions[cell_definitions[:, 4], :]
-	F_λ = ((east - west)/dΛ[i, newaxis])
-	dxdΛ, dydΛ = F_λ[:, 0], F_λ[:, 1]
+	else:
+		west = positions[cell_definitions[:, 3], :]
+		east = positions[cell_definitions[:, 4], :]
+		F_λ = ((east - west)*inverse_dΛ[:, newaxis])
+		dxdΛ, dydΛ = F_λ[:, 0], F_λ[:, 1]
 
-	south = positions[cell_definitions[:, 5], :]
-	north = positions[cell_definitions[:, 6], :]
-	F_ф = ((north - south)/dΦ[i, newaxis])
-	dxdΦ, dydΦ = F_ф[:, 0], F_ф[:, 1]
+		south = positions[cell_definitions[:, 5], :]
+		north = positions[cell_definitions[:, 6], :]
+		F_ф = ((north - south)*inverse_dΦ[:, newaxis])
+		dxdΦ, dydΦ = F_ф[:, 0], F_ф[:, 1]
 
 	trace = np.sqrt((dxdΛ + dydΦ)**2 + (dxdΦ - dydΛ)**2)/2
 	antitrace = np.sqrt((dxdΛ - dydΦ)**2 + (dxdΦ + dydΛ)**2)/2
@@ -574,15 +623,17 @@ def dilate_mesh(mesh: Mesh) -> Mesh:
 def show_projection(free_positions: Optional[NDArray[float]], all_positions: Optional[NDArray[float]],
                     velocity: Optional[NDArray[float]],
                     values: list[float], grads: list[float],
-                    mesh: Mesh, dΦ: NDArray[float], dΛ: NDArray[float],
+                    mesh: Mesh, inverse_dΦ: NDArray[float], inverse_dΛ: NDArray[float],
                     cell_definitions: NDArray[int], cell_weights: NDArray[float],
-                    coastlines: list[np.array], boundary: NDArray[float] | SparseNDArray,
+                    coastlines: NDArray[float], boundary: NDArray[float] | SparseNDArray,
                     map_width: float, map_hite: float,
                     map_axes: plt.Axes, hist_axes: plt.Axes,
                     valu_axes: plt.Axes, diff_axes: plt.Axes,
                     show_axes: bool, show_distortion: bool) -> None:
 	""" display the current state of the optimization process, including a preliminary map, a
 	    distortion histogram, and a convergence as a function of time plot
+	    :param coastlines: the coastlines to draw, as a 2×n array of fractional indices into the mesh's ф
+	                       and λ axes, with separate coastlines separated by nans
 	"""
 	# convert the state vector into real space if needed
 	if mesh.nodes.ndim == 3:
@@ -607,16 +658,16 @@ def show_projection(free_positions: Optional[NDArray[float]], all_positions: Opt
 			                    cmap="RdBu", norm=LogNorm(vmin=1/10, vmax=10),
 			                    zorder=1)
 		else:
-			# plot the underlying mesh for each section
-			map_axes.plot(mesh.nodes[h, :, :, 0], mesh.nodes[h, :, :, 1], "#bbb", linewidth=.3, zorder=1)
-			map_axes.plot(mesh.nodes[h, :, :, 0].T, mesh.nodes[h, :, :, 1].T, "#bbb", linewidth=.3, zorder=1)
+			# plot the underlying mesh for each section (as one long nan-separated line in each direction,
+			# since making a separate artist for every gridline is what makes this slow)
+			for gridlines in [mesh.nodes[h, :, :, :], mesh.nodes[h, :, :, :].transpose((1, 0, 2))]:
+				gridlines = np.pad(gridlines, [(0, 0), (0, 1), (0, 0)], constant_values=nan)
+				map_axes.plot(gridlines[:, :, 0].ravel(), gridlines[:, :, 1].ravel(), "#bbb", linewidth=.3, zorder=1)
 
 		# crudely project and plot the coastlines onto each section
-		project = RegularGridInterpolator(
-			[mesh.ф, mesh.λ], mesh.nodes[h, :, :, :], bounds_error=False, fill_value=nan)
-		for line in coastlines:
-			projected_line = project(line)
-			map_axes.plot(projected_line[:, 0], projected_line[:, 1], "#000", linewidth=.8, zorder=2)
+		projected_x = map_coordinates(mesh.nodes[h, :, :, 0], coastlines, order=1, cval=nan)
+		projected_y = map_coordinates(mesh.nodes[h, :, :, 1], coastlines, order=1, cval=nan)
+		map_axes.plot(projected_x, projected_y, "#000", linewidth=.8, zorder=2)
 
 	# plot the outline of the mesh
 	map_axes.fill(boundary[:, 0], boundary[:, 1],
@@ -634,14 +685,12 @@ def show_projection(free_positions: Optional[NDArray[float]], all_positions: Opt
 		                 c=-np.linalg.norm(velocity, axis=1),
 		                 vmax=0, cmap=CUSTOM_CMAP["speed"], zorder=0)
 
-	a, b = compute_principal_strains(all_positions, cell_definitions, dΦ, dΛ)
+	a, b = compute_principal_strains(all_positions, cell_definitions, inverse_dΦ, inverse_dΛ)
 
 	# mark any nodes with nonpositive principal strains
 	bad_cells = np.nonzero((a <= 0) | (b <= 0))[0]
-	for cell in bad_cells:
-		h, i, j, east, west, north, south = cell_definitions[cell, :]
-		map_axes.plot(all_positions[[east, west], 0], all_positions[[east, west], 1], "#f50", linewidth=.8)
-		map_axes.plot(all_positions[[north, south], 0], all_positions[[north, south], 1], "#f50", linewidth=.8)
+	bad_edges = cell_definitions[bad_cells, 3:7].reshape((-1, 2))  # the west-east and south-north pair of each cell
+	map_axes.add_collection(LineCollection(all_positions[bad_edges, :], colors="#f50", linewidths=.8, zorder=2))
 	map_axes.axis("equal")
 	map_axes.margins(.01)
 
@@ -826,13 +875,17 @@ def load_mesh(filename: str) -> Mesh:
 	    file, in that order.
 	"""
 	with h5py.File(f"../resources/meshes/{filename}.h5", "r") as file:
-		ф = file["section0/latitude"][:]
-		λ = file["section0/longitude"][:]
+		if "latitude" in file:
+			ф = file["latitude"][:]
+			λ = file["longitude"][:]
+		else:  # older meshes have a copy of the latitudes and longitudes in every section
+			ф = file["section0/latitude"][:]
+			λ = file["section0/longitude"][:]
 		num_sections = file.attrs["num_sections"]
 		nodes = np.empty((num_sections, ф.size, λ.size, 2))
 		section_boundaries = []
 		for h in range(num_sections):
-			nodes[h, :, :, :] = file[f"section{h}/projection"][:, :, :]
+			file[f"section{h}/projection"].read_direct(nodes, dest_sel=np.s_[h, :, :, :])  # (skip the temporary array)
 			section_boundaries.append(file[f"section{h}/border"][:, :])
 	return Mesh(section_boundaries, ф, λ, nodes)
 
@@ -1152,22 +1205,26 @@ def project_section_boundaries(mesh: Mesh, resolution: float) -> Union[NDArray[f
 	return simplify_path(complete_boundary, cyclic=True)
 
 
-def downsample(full: NDArray[float], shape: tuple):
+def downsample(full: NDArray[float], shape: tuple, out: Optional[NDArray[float]] = None):
 	""" decrease the size of a numpy array by setting each pixel to the mean of the pixels
-	    in the original image for which it was the nearest neibor
+	    in the original image for which it was the nearest neibor.  if out is given, the result is
+	    written into it instead of into a new array.
 	"""
+	if out is None:
+		out = np.empty(shape, dtype=float)
 	if full.shape == ():
-		return np.full(shape, full)
+		out[...] = full
+		return out
 	assert len(shape) == len(full.shape)
 	for i in range(len(shape)):
 		assert shape[i] < full.shape[i]
-	reduce = np.empty(shape)
-	i_reduce = (np.arange(full.shape[0])/full.shape[0]*reduce.shape[0]).astype(int)
-	j_reduce = (np.arange(full.shape[1])/full.shape[1]*reduce.shape[1]).astype(int)
-	for i in range(shape[0]):
-		for j in range(shape[1]):
-			reduce[i][j] = np.mean(full[i_reduce == i][:, j_reduce == j])
-	return reduce
+	i_reduce = (np.arange(full.shape[0])/full.shape[0]*shape[0]).astype(int)
+	j_reduce = (np.arange(full.shape[1])/full.shape[1]*shape[1]).astype(int)
+	# sum up and count the pixels that go into each reduced pixel all at once
+	k_reduce = (i_reduce[:, np.newaxis]*shape[1] + j_reduce[np.newaxis, :]).ravel()
+	total = np.bincount(k_reduce, weights=full.ravel(), minlength=shape[0]*shape[1])
+	count = np.bincount(k_reduce, minlength=shape[0]*shape[1])
+	return np.divide(total.reshape(shape), count.reshape(shape), out=out)
 
 
 def get_bounding_box(points: NDArray[float]) -> NDArray[float]:
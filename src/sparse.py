@@ -253,6 +253,9 @@ class SparseNDArray:
 			# result.sum_duplicates()
 			# result.eliminate_zeros()
 			return SparseNDArray(result, out_shape, other.sparse_ndim)
+		elif type(other) is np.ndarray:
+			# let scipy do this one directly rather than letting numpy turn self into a dense array
+			return (self.csr @ other.reshape((other.shape[0], -1))).reshape(out_shape)
 		else:
 			return NotImplemented
 
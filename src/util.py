@@ -78,23 +78,22 @@ def normalize(vector: NDArray[float]) -> NDArray[float]:
 
 
 def vector_normalize(vector: NDArray[float]) -> NDArray[float]:
-	""" normalize a vector such that its magnitude is one """
-	if np.all(np.equal(vector, 0)):
-		return vector
-	else:
-		return np.divide(vector, np.linalg.norm(vector))
+	""" normalize a vector (or each vector along the last axis) such that its magnitude is one """
+	magnitude = np.linalg.norm(vector, axis=-1, keepdims=True)
+	return np.divide(vector, magnitude, out=np.zeros(np.shape(vector)), where=magnitude != 0)
 
 
 def offset_from_angle(a: NDArray[float], b: NDArray[float], c: NDArray[float],
                       offset: float) -> NDArray[float]:
-	""" find a point that is diagonally offset from a bend in a path, in the direction it points """
-	bend_direction = vector_normalize(c - b) - \
-	                 vector_normalize(b - a)
-	if hypot(*bend_direction) > 1e-4:
-		bend_direction = vector_normalize(bend_direction)
-	else:
-		travel_direction = vector_normalize(c - b)
-		bend_direction = np.array([-travel_direction[1], travel_direction[0]])
+	""" find the point that is diagonally offset from a bend in a path, in the direction it points.
+	    this is vectorized, so the last axis of each point will be taken as the coordinate axis.
+	"""
+	travel_direction = vector_normalize(c - b)
+	bend_direction = travel_direction - vector_normalize(b - a)
+	is_bent = np.hypot(bend_direction[..., 0], bend_direction[..., 1]) > 1e-4
+	bend_direction = np.where(is_bent[..., np.newaxis],
+	                          vector_normalize(bend_direction),
+	                          np.stack([-travel_direction[..., 1], travel_direction[..., 0]], axis=-1))
 	return b - offset*bend_direction
 
 
@@ -177,9 +176,8 @@ def dilate(x: NDArray[bool], distance: int) -> NDArray[bool]:
 	""" take a 1D boolean array and make it so that any Falses near Trues become True.
 	    then return the modified array.
 	"""
-	for i in range(distance):
-		x[:-1] |= x[1:]
-		x[1:] |= x[:-1]
+	# count the Trues within distance of each element in one pass
+	x[:] = np.convolve(x, np.ones(2*distance + 1))[distance:distance + x.size] > 0
 	return x
 
 
@@ -189,11 +187,11 @@ def expand(arr: NDArray[bool], distance: int, account_for_periodicity=False) ->
 	"""
 	if distance != 1:
 		raise NotImplementedError()
-	out = np.full((arr.shape[0] + 1, arr.shape[1] + 1), False)
-	out[:-1, :-1] |= arr
-	out[:-1, 1:] |= arr
-	out[1:, :-1] |= arr
-	out[1:, 1:] |= arr
+	padded = np.full((arr.shape[0] + 2, arr.shape[1] + 2), False)
+	padded[1:-1, 1:-1] = arr
+	# do it one axis at a time, so it's two shifts instead of four
+	expanded_rows = padded[:-1, :] | padded[1:, :]
+	out = expanded_rows[:, :-1] | expanded_rows[:, 1:]
 	if account_for_periodicity:
 		out[:, 0] |= out[:, -1]
 		out[:, -1] = out[:, 0]
@@ -478,6 +476,30 @@ def make_path_go_around_pole(path: list[tuple[float, float]] | NDArray[float]) -
 	return path
 
 
+def split_at_antimeridian(path: NDArray[float], period=360) -> NDArray[float]:
+	""" add points to a path (in degrees) on a globe such that whenever it crosses the
+	    antimeridian, it does so by jumping straight from one edge of the domain to the other at a
+	    constant latitude, rather than along some diagonal segment.
+	"""
+	# (segments that already jump straight from one edge to the other don't need any new points)
+	on_edge = abs(path[:, 1]) == period/2
+	wrapping = np.nonzero((abs(np.diff(path[:, 1])) > period/2) &
+	                      ~(on_edge[:-1] & on_edge[1:]))[0]
+	if wrapping.size == 0:
+		return path
+	ф0, λ0 = path[wrapping, 0], path[wrapping, 1]
+	ф1, λ1 = path[wrapping + 1, 0], path[wrapping + 1, 1]
+	# find where each one hits the edge of the domain
+	edge = np.sign(λ0)*period/2
+	ф_edge = interp(edge, λ0, λ1 + np.sign(λ0)*period, ф0, ф1)
+	virtual_vertices = np.stack([np.stack([ф_edge, edge], axis=-1),
+	                             np.stack([ф_edge, -edge], axis=-1)], axis=1)
+	# (but don't duplicate any endpoints that are already on the edge)
+	needed = np.stack([~on_edge[wrapping], ~on_edge[wrapping + 1]], axis=1)
+	return np.insert(path, np.repeat(wrapping + 1, 2)[needed.ravel()],
+	                 virtual_vertices.reshape((-1, 2))[needed.ravel()], axis=0)
+
+
 def inside_polygon(x: NDArray[float], y: NDArray[float], polygon: NDArray[float], convex=False) -> NDArray[bool]:
 	""" take a set of points in the plane and run a polygon containment test
 	    :param x: the x coordinates of the points
@@ -510,10 +532,17 @@ def inside_region(ф: Numeric, λ: Numeric, region: NDArray[float], period=360)
 	"""
 	ф, λ = np.array(ф), np.array(λ)
 	if ф.ndim == 1 and λ.ndim == 1 and ф.size != λ.size:
-		ф, λ = ф[:, np.newaxis], λ[np.newaxis, :]
-		out_shape = (ф.size, λ.size)
+		# rows entirely above or below the region will all get the same anser, so only test one of each
+		ф_min, ф_max = np.min(region[:, 0]), np.max(region[:, 0])
+		row_index = np.arange(ф.size)
+		if np.any((ф < ф_min) | (ф > ф_max)):
+			ф, row_index = np.unique(np.clip(ф, ф_min - 1, ф_max + 1), return_inverse=True)
+		ф = ф[:, np.newaxis]  # in a grid, each segment affects whole collums, so we only need to index λ
 	else:
+		ф, λ = np.broadcast_arrays(ф, λ)
 		out_shape = ф.shape
+		ф, λ = ф.ravel(), λ.ravel()
+		row_index = None
 	# first we need to characterize the region so that we can classify points at untuched longitudes
 	δλ_border = region[1:, 1] - region[:-1, 1]
 	δλ_border[abs(δλ_border) == period] *= -1
@@ -521,20 +550,27 @@ def inside_region(ф: Numeric, λ: Numeric, region: NDArray[float], period=360)
 	inside_out = δλ_border[np.argmax(ф_border)] > 0 # for closed regions we have this nice trick
 
 	# then we can bild up a precise bool mapping
-	inside = np.full(out_shape, inside_out)
-	nearest_segment = np.full(out_shape, np.inf)
+	inside = np.full(ф.shape[:-1] + λ.shape, inside_out)
+	nearest_segment = np.full(inside.shape, np.inf)
 	for i in reversed(range(1, region.shape[0])):  # the reversed happens to make it better in one particular edge case
 		ф0, λ0 = region[i - 1, :]
 		ф1, λ1 = region[i, :]
 		# this is a nonzero model based on virtual vertical rays drawn from each queried point
 		if λ1 != λ0 and abs(λ1 - λ0) <= period/2:
-			straddles = (λ0 <= λ) != (λ1 <= λ)
-			фX = interp(λ, λ0, λ1, ф0, ф1)
-			Δф = abs(фX - ф)
-			affected = straddles & (Δф < nearest_segment)
-			inside[affected] = (λ1 > λ0) != (фX > ф)[affected]
-			nearest_segment[affected] = Δф[affected]
-	return inside
+			# only bother with the points whose longitudes this segment actually spans
+			straddles, = np.nonzero((λ0 <= λ) != (λ1 <= λ))
+			фX = interp(λ[straddles], λ0, λ1, ф0, ф1)
+			ф_straddling = ф if ф.ndim == 2 else ф[straddles]
+			Δф = abs(фX - ф_straddling)
+			affected = Δф < nearest_segment[..., straddles]
+			inside[..., straddles] = np.where(
+				affected, (λ1 > λ0) != (фX > ф_straddling), inside[..., straddles])
+			nearest_segment[..., straddles] = np.where(
+				affected, Δф, nearest_segment[..., straddles])
+	if row_index is not None:
+		return inside[row_index, :]  # (make sure to expand any rows we combined)
+	else:
+		return inside.reshape(out_shape)
 
 
 def minimum_swaps(arr) -> int: